@@ -1,82 +1,174 @@
+import functools
 import sqlite3
 import os
 import re
+import stat
 from pathlib import Path
 
 class DatabaseError(Exception):
     """Custom exception for database operations"""
     pass
 
+# MySQL to SQLite conversions
+# Each tuple contains (pattern_to_find, replacement_text)
+_MYSQL_TO_SQLITE = [
+    # Data type conversions
+    (r'int\([0-9]+\)', 'INTEGER'),  # MySQL allows size specification for int
+    (r'varchar\([0-9]+\)', 'TEXT'),  # SQLite uses dynamic TEXT type
+    (r'decimal\([^)]*\)', 'REAL'),  # Convert all decimal variants to REAL
+    (r'double\([^)]*\)', 'REAL'),  # Convert all double variants to REAL
+
+    # Remove MySQL-specific features
+    (r'AUTO_INCREMENT', ''),  # SQLite uses AUTOINCREMENT keyword
+    (r'^[^\S\n]*CREATE[^\S\n]+DATABASE[^;\n]*;', ''),  # SQLite is serverless
+    (r'^[^\S\n]*USE\b[^;\n]*;', ''),  # SQLite uses file-based databases
+    (r'ENGINE[^\S\n]*=[^\S\n]*\w+', ''),  # SQLite doesn't use storage engines
+    (r'DEFAULT[^\S\n]+CHARSET[^\S\n]*=[^\S\n]*\w+', ''),  # SQLite handles text encoding differently
+    (r'COLLATE[^\S\n]+\w+', ''),  # SQLite has different collation syntax
+]
+
+# All conversions fused into one alternation so the script is scanned once.
+# Patterns contain no capture groups, so lastindex identifies the branch that matched.
+# They use negated character classes rather than .*? so matching is a linear scan without backtracking,
+# and statement patterns are anchored to the start of a line. Whitespace is matched with [^\S\n]
+# so no pattern spans lines, which lets the file be converted in blocks of whole lines.
+_COMBINED = re.compile(
+    "|".join(f"(?P<g{i}>{pattern})" for i, (pattern, _) in enumerate(_MYSQL_TO_SQLITE)),
+    re.IGNORECASE | re.MULTILINE,
+)
+_REPLACEMENTS = [replacement for _, replacement in _MYSQL_TO_SQLITE]
+
+# Cheap pre-scan for anything the conversions could touch; already-SQLite scripts are returned unchanged
+_TRIGGER = re.compile(
+    r'AUTO_INCREMENT|int\(|varchar\(|decimal\(|double\(|CREATE\s+DATABASE|\bUSE\b'
+    r'|ENGINE\s*=|DEFAULT\s+CHARSET|COLLATE\s',
+    re.IGNORECASE,
+)
+
+# Inputs up to this many characters are memoized by convert_mysql_to_sqlite
+CONVERSION_CACHE_MAX_CHARS = 4096
+
+# Command splitting: a command ends at a line ending in ';', lines starting with '--' are comments
+_STATEMENT_END_RE = re.compile(r';[^\S\n]*$', re.MULTILINE)
+_COMMENT_LINE_RE = re.compile(r'^[^\S\n]*--[^\n]*', re.MULTILINE)
+_LINE_BREAK_RE = re.compile(r'\s*\n\s*')
+
+# Number of bytes read, decoded, and converted at a time when streaming the SQL file
+SQL_CHUNK_SIZE = 1 << 20
+
 def validate_sql_file(file_path):
     """Validate that the SQL file exists and is readable"""
-    if not os.path.exists(file_path):
+    # A single stat() call answers existence, type, and size
+    try:
+        st = os.stat(file_path)
+    except OSError:
         raise DatabaseError(f"SQL file not found: {file_path}")
-    if not os.path.isfile(file_path):
+    if not stat.S_ISREG(st.st_mode):
         raise DatabaseError(f"Path is not a file: {file_path}")
-    if os.path.getsize(file_path) == 0:
+    if st.st_size == 0:
         raise DatabaseError(f"SQL file is empty: {file_path}")
 
+def _convert(sql):
+    """Apply the MySQL to SQLite conversions to a non-empty script"""
+    if not _TRIGGER.search(sql):
+        return sql
+
+    try:
+        return _COMBINED.sub(lambda m: _REPLACEMENTS[m.lastindex - 1], sql)
+    except re.error as e:
+        raise DatabaseError(f"Error in SQL conversion: {str(e)}")
+
+# Memoized conversion for short fragments, which tend to be converted repeatedly
+_convert_cached = functools.lru_cache(maxsize=128)(_convert)
+
 def convert_mysql_to_sqlite(sql):
     """Convert MySQL syntax to SQLite compatible syntax.
-    Handles type conversions, removes MySQL-specific features, and adjusts syntax differences."""
+    Handles type conversions, removes MySQL-specific features, and adjusts syntax differences.
+    Short inputs are cached; large scripts bypass the cache so it doesn't pin them in memory."""
     if not sql.strip():
         raise DatabaseError("Empty SQL script provided")
 
-    # Each tuple contains (pattern_to_find, replacement_text)
-    conversions = [
-        # Data type conversions
-        (r'int\([0-9]+\)', 'INTEGER'),  # MySQL allows size specification for int
-        (r'varchar\([0-9]+\)', 'TEXT'),  # SQLite uses dynamic TEXT type
-        (r'decimal\(.+\)', 'REAL'),  # Convert all decimal variants to REAL
-        (r'double\(.+\)', 'REAL'),  # Convert all double variants to REAL
-        
-        # Remove MySQL-specific features
-        (r'AUTO_INCREMENT', ''),  # SQLite uses AUTOINCREMENT keyword
-        (r'CREATE DATABASE.*?;', ''),  # SQLite is serverless
-        (r'USE.*?;', ''),  # SQLite uses file-based databases
-        (r'ENGINE\s*=\s*\w+', ''),  # SQLite doesn't use storage engines
-        (r'DEFAULT\s+CHARSET\s*=\s*\w+', ''),  # SQLite handles text encoding differently
-        (r'COLLATE\s+\w+', ''),  # SQLite has different collation syntax
-    ]
-    
-    try:
-        for pattern, replacement in conversions:
-            sql = re.sub(pattern, replacement, sql, flags=re.IGNORECASE)
-        return sql
-    except re.error as e:
-        raise DatabaseError(f"Error in SQL conversion: {str(e)}")
+    if len(sql) <= CONVERSION_CACHE_MAX_CHARS:
+        return _convert_cached(sql)
+    return _convert(sql)
 
-def split_sql_commands(sql_script):
-    """Split SQL script into individual commands and validate them.
-    Handles multi-line commands and skips comments."""
-    commands = []
-    current_command = []
-    
-    # Normalize line endings for cross-platform compatibility
-    lines = sql_script.replace('\r\n', '\n').split('\n')
+def iter_sql_chunks(file, chunk_size=SQL_CHUNK_SIZE):
+    """Read a binary SQL file in large blocks and yield them decoded and converted to SQLite syntax.
+    Each block is cut at its last newline and the tail carried into the next one, so blocks
+    hold whole lines. No conversion pattern matches across a newline, so converting block by
+    block matches converting the whole script while keeping memory bounded by the block size."""
+    remaining = b''
+    while True:
+        block = file.read(chunk_size)
+        if not block:
+            break
+        block = remaining + block
+        cut = block.rfind(b'\n') + 1
+        remaining = block[cut:]
+        chunk = block[:cut].decode('utf-8')
+        if chunk.strip():
+            yield convert_mysql_to_sqlite(chunk)
+
+    # Last line without a trailing newline
+    chunk = remaining.decode('utf-8')
+    if chunk.strip():
+        yield convert_mysql_to_sqlite(chunk)
+
+def iter_commands(chunks):
+    """Yield individual SQL commands from an iterable of script chunks.
+    A command ends at a line ending in ';'. Multi-line commands are joined onto
+    one line and comment lines are skipped."""
+    remaining = ''
     
-    for line in lines:
-        line = line.strip()
-        # Skip comments and empty lines to avoid processing non-SQL content
-        if not line or line.startswith('--'):
-            continue
-            
-        current_command.append(line)
-        
-        # Complete command found
-        if line.endswith(';'):
-            command = ' '.join(current_command)
+    for chunk in chunks:
+        # Drop comment lines, then slice out each terminated statement; the tail is carried into the next chunk
+        text = _COMMENT_LINE_RE.sub('', remaining + chunk)
+        start = 0
+        for match in _STATEMENT_END_RE.finditer(text):
+            command = _LINE_BREAK_RE.sub(' ', text[start:match.start()].strip())
+            start = match.end()
             if command.strip('; '):  # Avoid empty commands
-                commands.append(command)
-            current_command = []
+                yield command + ';'
+        remaining = text[start:]
     
     # Warn about potentially incomplete commands at end of file
-    if current_command:
-        remaining = ' '.join(current_command)
-        if remaining.strip():
-            print(f"Warning: Found incomplete SQL command: {remaining}")
+    remaining = _LINE_BREAK_RE.sub(' ', remaining.strip())
+    if remaining:
+        print(f"Warning: Found incomplete SQL command: {remaining}")
+
+def report_command_error(index, command, error):
+    """Print a failed command with a hint for common errors"""
+    error_msg = str(error)
+    print(f"\nError executing command {index}:")
+    print(f"Command: {command}")
+    print(f"Error: {error_msg}")
     
-    return commands
+    # Provide helpful hints for common errors
+    if "syntax error" in error_msg.lower():
+        print("Hint: This appears to be a syntax error. Check the SQL command format.")
+    elif "no such table" in error_msg.lower():
+        print("Hint: Referenced table doesn't exist. Check table creation order.")
+    elif "foreign key" in error_msg.lower():
+        print("Hint: Foreign key constraint failed. Check referenced table and key.")
+
+def execute_commands(cursor, commands):
+    """Execute commands one at a time, reporting failures without stopping.
+    Returns (total, successful) command counts."""
+    total = 0
+    successful = 0
+    # Echoing each CREATE TABLE is opt-in debug output, decided once rather than per command
+    debug_ddl = bool(os.environ.get("DEBUG_DDL"))
+
+    for total, command in enumerate(commands, 1):
+        try:
+            cursor.execute(command)
+            if debug_ddl and command.startswith('CREATE TABLE'):
+                print(command)
+            successful += 1
+        except sqlite3.Error as e:
+            report_command_error(total, command, e)
+
+    return total, successful
 
 def create_database(db_name='hospital.db', sql_file='hospital.sql'):
     """Create SQLite database from SQL file with enhanced error handling.
@@ -100,49 +192,31 @@ def create_database(db_name='hospital.db', sql_file='hospital.sql'):
                 raise DatabaseError(f"Cannot delete existing database {db_name}. File may be in use.")
         
         # Initialize database connection
-        conn = sqlite3.connect(db_name)
+        # Build in memory and write the finished database to disk once at the end
+        conn = sqlite3.connect(":memory:")
+        # Manage the transaction explicitly so the whole load commits once
+        conn.isolation_level = None
         cursor = conn.cursor()
         
         # SQLite foreign keys are disabled by default
         cursor.execute("PRAGMA foreign_keys = ON;")
+        cursor.execute("PRAGMA temp_store = MEMORY;")
         
         try:
-            # Process and execute SQL commands
-            with open(sql_path, 'r', encoding='utf-8') as file:
-                sql_script = file.read()
+            # Stream, convert, and execute SQL commands in a single transaction
+            cursor.execute("BEGIN")
+            # Unbuffered binary reads: blocks are already large, so a Python-side buffer would only add a copy
+            with open(sql_path, 'rb', buffering=0) as file:
+                total_commands, successful_commands = execute_commands(cursor, iter_commands(iter_sql_chunks(file)))
             
-            sql_script = convert_mysql_to_sqlite(sql_script)
-            commands = split_sql_commands(sql_script)
-            
-            if not commands:
+            if not total_commands:
                 raise DatabaseError("No valid SQL commands found in the file")
             
-            # Execute commands and track progress
-            total_commands = len(commands)
-            successful_commands = 0
-            
-            for i, command in enumerate(commands, 1):
-                try:
-                    cursor.execute(command)
-                    if command.strip().startswith('CREATE TABLE'):
-                        print(command)
-                    successful_commands += 1
-                except sqlite3.Error as e:
-                    error_msg = str(e)
-                    print(f"\nError executing command {i}/{total_commands}:")
-                    print(f"Command: {command}")
-                    print(f"Error: {error_msg}")
-                    
-                    # Provide helpful hints for common errors
-                    if "syntax error" in error_msg.lower():
-                        print("Hint: This appears to be a syntax error. Check the SQL command format.")
-                    elif "no such table" in error_msg.lower():
-                        print("Hint: Referenced table doesn't exist. Check table creation order.")
-                    elif "foreign key" in error_msg.lower():
-                        print("Hint: Foreign key constraint failed. Check referenced table and key.")
-            
             conn.commit()
             
+            # Serialize the in-memory database to a compact file in one sequential write
+            cursor.execute("VACUUM INTO ?", (str(db_path),))
+            
             # Report final status
             print(f"\nDatabase creation completed:")
             print(f"- Total commands: {total_commands}")
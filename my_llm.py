@@ -1,21 +1,35 @@
-from huggingface_hub import InferenceClient
+import asyncio
+import sys
+from pathlib import Path
+
+from huggingface_hub import AsyncInferenceClient, InferenceClient, InferenceTimeoutError
+from huggingface_hub.utils import HfHubHTTPError
 
 # Model
 llm_agent = "microsoft/Phi-3-mini-4k-instruct"
 
-# Read API key
+# Read API key, stripping the trailing newline so it doesn't corrupt the auth header
 api_key_filename = "hf_api_key.txt"
-with open(api_key_filename, "r") as f:
-    api_key = f.read()
+api_key = Path(api_key_filename).read_text(encoding="utf-8").strip()
+if not api_key:
+    raise ValueError(f"API key file is empty: {api_key_filename}")
+
+# Define inference client once and reuse its HTTP session across prompts
+client = InferenceClient(
+    provider="hf-inference",
+    api_key=api_key,
+)
+
+# Maximum number of piped prompts sent to the LLM at once
+batch_concurrency = 4
 
 # Generates LLM response using a prompt (user input) and model name
+# The response is printed as it streams in and returned as a string
 def llm_prompt(prompt, model):
 
-    # Define inference client
-    client = InferenceClient(
-        provider="hf-inference",
-        api_key=api_key,
-    )
+    # Nothing to ask, skip the network call
+    if not prompt.strip():
+        return ""
 
     # Get response from LLM
     completion = client.chat.completions.create(
@@ -26,23 +40,90 @@ def llm_prompt(prompt, model):
                 "content": prompt
             }
         ],
-        max_tokens=50
+        max_tokens=50,
+        stream=True
     )
 
+    # Print tokens as they arrive
+    response = []
+    for chunk in completion:
+        # Some chunks (e.g. a final usage-only chunk) carry no choices
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content or ""
+        print(token, end="", flush=True)
+        response.append(token)
+    print()
+
     # Return response
-    return completion.choices[0].message
+    return "".join(response)
+
+# Generates LLM responses for several prompts concurrently, so the round-trips overlap
+async def llm_prompt_batch(prompts, model):
+
+    # Only piped mode needs the async client, so create it here rather than at import
+    async with AsyncInferenceClient(
+        provider="hf-inference",
+        api_key=api_key,
+    ) as async_client:
+
+        # Cap requests in flight so a large batch doesn't trip the provider's rate limit
+        semaphore = asyncio.Semaphore(batch_concurrency)
+
+        # Failures of a single request; anything else (e.g. missing aiohttp) stops the whole batch
+        request_errors = (HfHubHTTPError, InferenceTimeoutError)
+        try:
+            import aiohttp
+            request_errors += (aiohttp.ClientError,)
+        except ImportError:
+            pass  # Newer huggingface_hub releases use httpx and don't need aiohttp
+
+        async def answer(prompt):
+            async with semaphore:
+                try:
+                    completion = await async_client.chat.completions.create(
+                        model=model,
+                        messages=[
+                            {
+                                "role": "user",
+                                "content": prompt
+                            }
+                        ],
+                        max_tokens=50
+                    )
+                except request_errors as e:
+                    # A rejected key fails every prompt the same way, so stop instead of repeating it
+                    if isinstance(e, HfHubHTTPError) and e.response is not None and e.response.status_code in (401, 403):
+                        raise
+                    # Report the failure for this prompt without discarding the other answers
+                    return f"Error: {e}"
+            return completion.choices[0].message.content or ""
+
+        # Return responses in prompt order
+        return await asyncio.gather(*[answer(prompt) for prompt in prompts])
 
 
 
 
-user_input = ""
+# Piped input: answer every prompt (one per line, up to "exit") in a single batch
+if not sys.stdin.isatty():
+    prompts = []
+    for line in sys.stdin:
+        line = line.strip()
+        if line.lower() == "exit":
+            break
+        if line:
+            prompts.append(line)
+    for response in asyncio.run(llm_prompt_batch(prompts, llm_agent)):
+        print(response)
 
-# Prompt the user until they exit
-while user_input != "exit":
-    user_input = input("Enter a prompt: ")
-    if user_input == "exit":
-        break
-    print(llm_prompt(user_input, llm_agent))
+# Interactive: prompt the user until they exit
+else:
+    while True:
+        user_input = input("Enter a prompt: ").strip()
+        if user_input.lower() == "exit":
+            break
+        llm_prompt(user_input, llm_agent)
 
 
 